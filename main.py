@@ -1,49 +1,191 @@
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from lxml import etree
+from bisect import bisect_right
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from urllib.parse import urljoin, urlparse
 import unittest
 from unittest.mock import patch, MagicMock, call
+import codecs
 import sys
 from io import StringIO
 
-class WebCrawler:
+# Length of the character n-grams used to index page text for substring search
+NGRAM_SIZE = 3
+
+# Elements whose text is not page content, matching BeautifulSoup's get_text()
+NON_TEXT_TAGS = {'script', 'style', 'template'}
+
+class PageParser:
+    """lxml parser target that collects page text and unique anchor hrefs while parsing"""
+
     def __init__(self):
-        self.index = defaultdict(list)
+        self.text = []
+        # Nesting depth inside NON_TEXT_TAGS; text is dropped while above zero
+        self.skip_depth = 0
+        # dict rather than set so hrefs keep their document order
+        self.hrefs = {}
+
+    def start(self, tag, attrib):
+        if tag in NON_TEXT_TAGS:
+            self.skip_depth += 1
+        elif tag == 'a':
+            href = attrib.get('href')
+            if href is not None:
+                self.hrefs[href] = None
+
+    def end(self, tag):
+        if tag in NON_TEXT_TAGS and self.skip_depth:
+            self.skip_depth -= 1
+
+    def data(self, data):
+        if not self.skip_depth:
+            self.text.append(data)
+
+    def comment(self, text):
+        pass
+
+    def close(self):
+        return "".join(self.text), list(self.hrefs)
+
+class WebCrawler:
+    def __init__(self, max_workers=8):
+        self.index = {}
+        self.ngrams = defaultdict(set)
+        # All page texts concatenated, with the start offset and URL of each page
+        self.corpus = bytearray()
+        self.page_offsets = []
+        self.page_urls = []
         self.visited = set()
+        self.max_workers = max_workers
+        # Reuse keep-alive connections across same-host fetches; one pooled
+        # connection per worker so concurrent fetches never discard sockets
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def fetch_page(self, url):
+        # Feed the body to the parser as it streams in, so the page is never
+        # held as one decoded string alongside its parse
+        response = self.session.get(url, timeout=10, stream=True)
+        try:
+            # Decode with Python's codecs, as response.text did; libxml2 does not
+            # know every charset label requests reports
+            decoder = None
+            if response.encoding:
+                try:
+                    decoder = codecs.getincrementaldecoder(response.encoding)(errors="replace")
+                except LookupError:
+                    pass  # Unknown charset; let lxml detect the encoding itself
+            parser = etree.HTMLParser(target=PageParser())
+            fed = False
+            for chunk in response.iter_content(chunk_size=65536):
+                parser.feed(decoder.decode(chunk) if decoder else chunk)
+                fed = True
+            if not fed:
+                # lxml rejects a document it was never fed; index it as empty
+                return "", []
+            if decoder:
+                tail = decoder.decode(b"", final=True)
+                if tail:
+                    parser.feed(tail)
+            return parser.close()
+        finally:
+            response.close()
 
     def crawl(self, url, base_url=None):
-        if url in self.visited:
-            return
-        self.visited.add(url)
+        base = base_url or url
+        parsed_base = urlparse(base)
+        origin = f"{parsed_base.scheme}://{parsed_base.netloc}"
+        # LIFO stack of pages still to fetch, popped in depth-first order
+        frontier = [sys.intern(url)]
 
-        try:
-            response = requests.get(url)
-            soup = BeautifulSoup(response.text, 'html.parser')
-            self.index[url] = soup.get_text()
-
-            for link in soup.find_all('a'):
-                href = link.get('href')
-                if href:
-                    # Handle relative URLs (e.g., /about)
-                    if not urlparse(href).netloc:
-                        full_url = urljoin(url, href)
-                    else:
-                        full_url = href
-
-                    # Only follow links to the same domain
-                    base = base_url or url
-                    if full_url.startswith(base):
-                        self.crawl(full_url, base_url=base)
-        except Exception as e:
-            print(f"Error crawling {url}: {e}")
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while frontier:
+                # Dispatch up to max_workers unvisited pages to fetch in parallel
+                pending = {}
+                while frontier and len(pending) < self.max_workers:
+                    next_url = frontier.pop()
+                    if next_url in self.visited:
+                        continue
+                    self.visited.add(next_url)
+                    future = executor.submit(self.fetch_page, next_url)
+                    pending[future] = next_url
+
+                # Handle pages as they arrive; all state is mutated on this thread
+                for future in as_completed(pending):
+                    page_url = pending[future]
+                    try:
+                        text, hrefs = future.result()
+                        self.index_page(page_url, text)
+
+                        # Distinct hrefs can still resolve to the same URL
+                        links = {}
+                        for href in hrefs:
+                            # Root-relative links (e.g., /about) share the base origin,
+                            # so skip the generic URL resolution for them unless they
+                            # carry dot segments that urljoin must normalize
+                            if href.startswith('/') and not href.startswith('//') and '/.' not in href:
+                                full_url = origin + href
+                            elif href.startswith(('http://', 'https://')):
+                                full_url = href
+                            else:
+                                full_url = urljoin(page_url, href)
+
+                            # Only follow links to the same domain
+                            if full_url.startswith(base) and full_url not in self.visited:
+                                # Intern so every reference to a URL shares one string
+                                links[sys.intern(full_url)] = None
+
+                        # Push in reverse so the page's first link is popped first
+                        frontier.extend(reversed(links))
+                    except Exception as e:
+                        print(f"Error crawling {page_url}: {e}")
+
+    def index_page(self, url, text):
+        # Lowercase once here so search never re-lowercases documents
+        text = text.lower()
+        self.index[url] = text
+        n = NGRAM_SIZE
+        for gram in {text[i:i + n] for i in range(len(text) - n + 1)}:
+            self.ngrams[gram].add(url)
+        self.page_offsets.append(len(self.corpus))
+        self.page_urls.append(url)
+        self.corpus += text.encode("utf-8") + b"\0"
 
     def search(self, keyword):
+        keyword = keyword.lower()
+        n = NGRAM_SIZE
+        if len(keyword) < n:
+            # Too short to have an n-gram; fall back to scanning the whole corpus
+            return self.scan_corpus(keyword)
+
+        # Every page containing the keyword contains all of its n-grams, so
+        # intersect their posting lists (smallest first), then confirm survivors
+        grams = {keyword[i:i + n] for i in range(len(keyword) - n + 1)}
+        postings = sorted((self.ngrams.get(gram, set()) for gram in grams), key=len)
+        if not postings[0]:
+            return []
+        candidates = postings[0].intersection(*postings[1:])
+        return sorted(url for url in candidates if keyword in self.index[url])
+
+    def scan_corpus(self, keyword):
+        if not self.page_offsets:
+            return []
+        # One C-level find over every page at once instead of a scan per page
+        needle = keyword.encode("utf-8")
         results = []
-        for url, text in self.index.items():
-            if keyword.lower() in text.lower():
-                results.append(url)
-        return results
+        pos = self.corpus.find(needle)
+        while pos != -1:
+            page = bisect_right(self.page_offsets, pos) - 1
+            results.append(self.page_urls[page])
+            if page + 1 == len(self.page_offsets):
+                break
+            # Resume at the next page so each page is reported once
+            pos = self.corpus.find(needle, self.page_offsets[page + 1])
+        return sorted(results)
 
     def print_results(self, results):
         if results:
@@ -54,7 +196,7 @@ class WebCrawler:
             print("No results found.")
 
 def main():
-    crawler = WebCrawler()
+    crawler = WebCrawler(max_workers=20)
     start_url = "https://example.com"
     crawler.crawl(start_url)
 
@@ -62,6 +204,13 @@ def main():
     results = crawler.search(keyword)
     crawler.print_results(results)
 
+def mock_page(html):
+    """Build a mock streamed response serving the given HTML"""
+    response = MagicMock()
+    response.encoding = "utf-8"
+    response.iter_content.return_value = [html.encode("utf-8")]
+    return response
+
 class WebCrawlerTests(unittest.TestCase):
     def setUp(self):
         """Set up test fixtures before each test method"""
@@ -73,12 +222,17 @@ class WebCrawlerTests(unittest.TestCase):
     
     def test_init(self):
         """Test initialization of WebCrawler class"""
-        self.assertIsInstance(self.crawler.index, defaultdict)
+        self.assertIsInstance(self.crawler.index, dict)
+        self.assertNotIsInstance(self.crawler.index, defaultdict)
         self.assertEqual(len(self.crawler.index), 0)
+        self.assertIsInstance(self.crawler.ngrams, defaultdict)
+        self.assertEqual(len(self.crawler.ngrams), 0)
+        self.assertEqual(len(self.crawler.corpus), 0)
         self.assertIsInstance(self.crawler.visited, set)
         self.assertEqual(len(self.crawler.visited), 0)
+        self.assertIsInstance(self.crawler.session, requests.Session)
 
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_crawl_success(self, mock_get):
         """Test successful crawling with link discovery"""
         sample_html = """
@@ -89,9 +243,7 @@ class WebCrawlerTests(unittest.TestCase):
             <a href="/contact">Contact</a>
         </body></html>
         """
-        mock_response = MagicMock()
-        mock_response.text = sample_html
-        mock_get.return_value = mock_response
+        mock_get.return_value = mock_page(sample_html)
 
         self.crawler.crawl("https://example.com")
 
@@ -106,12 +258,115 @@ class WebCrawlerTests(unittest.TestCase):
         # Assert external links are not crawled
         self.assertNotIn("https://www.external.com", self.crawler.visited)
         
-        # Verify requests.get was called correctly
-        mock_get.assert_any_call("https://example.com")
-        mock_get.assert_any_call("https://example.com/about")
-        mock_get.assert_any_call("https://example.com/contact")
+        # Verify the session fetched each page
+        mock_get.assert_any_call("https://example.com", timeout=10, stream=True)
+        mock_get.assert_any_call("https://example.com/about", timeout=10, stream=True)
+        mock_get.assert_any_call("https://example.com/contact", timeout=10, stream=True)
+
+    @patch('requests.Session.get')
+    def test_fetch_page_deduplicates_hrefs(self, mock_get):
+        """Test repeated anchors on a page are reported once, in document order"""
+        mock_get.return_value = mock_page("""
+        <html><body>
+            <a href="/about">About</a>
+            <a href="/contact">Contact</a>
+            <a href="/about">About again</a>
+        </body></html>
+        """)
+
+        text, hrefs = self.crawler.fetch_page("https://example.com")
+
+        self.assertEqual(hrefs, ["/about", "/contact"])
+
+    @patch('requests.Session.get')
+    def test_fetch_page_skips_script_and_style_text(self, mock_get):
+        """Test script, style and template contents are not indexed as page text"""
+        mock_get.return_value = mock_page("""
+        <html><head><style>.x{}</style><script>var secret=1;</script></head>
+        <body><template><p>hidden</p></template><p>hi</p></body></html>
+        """)
+
+        text, hrefs = self.crawler.fetch_page("https://example.com")
+
+        self.assertEqual(text.strip(), "hi")
+
+    @patch('requests.Session.get')
+    def test_crawl_empty_page(self, mock_get):
+        """Test a page with an empty body is indexed as empty text"""
+        response = mock_page("")
+        response.iter_content.return_value = []
+        mock_get.return_value = response
+
+        captured_output = StringIO()
+        sys.stdout = captured_output
+
+        try:
+            self.crawler.crawl("https://example.com")
+
+            self.assertEqual(self.crawler.index, {"https://example.com": ""})
+            self.assertEqual(captured_output.getvalue(), "")
+        finally:
+            sys.stdout = sys.__stdout__
+
+    @patch('requests.Session.get')
+    def test_crawl_skips_anchors_without_href(self, mock_get):
+        """Test anchors without an href are ignored"""
+        html = """
+        <html><body>
+            <a name="top">Top</a>
+            <a href="">Empty</a>
+            <a href="/about">About</a>
+        </body></html>
+        """
+        mock_get.return_value = mock_page(html)
+
+        self.crawler.crawl("https://example.com")
+
+        self.assertEqual(self.crawler.visited, {"https://example.com", "https://example.com/about"})
+
+    @patch('requests.Session.get')
+    def test_crawl_resolves_relative_links(self, mock_get):
+        """Test page-relative and protocol-relative links are resolved"""
+        def mock_get_response(url, **kwargs):
+            if url == "https://example.com/docs/":
+                html = """
+                <html><body>
+                    <a href="intro">Intro</a>
+                    <a href="//example.com/docs/faq">FAQ</a>
+                    <a href="//other.com/docs/">Other</a>
+                    <a href="login?next=https://example.com/docs/x">Login</a>
+                    <a href="/docs/a/../b">Dot segments</a>
+                </body></html>
+                """
+            else:
+                html = "<html><body>Content</body></html>"
+            return mock_page(html)
+
+        mock_get.side_effect = mock_get_response
+
+        self.crawler.crawl("https://example.com/docs/")
 
-    @patch('requests.get')
+        self.assertEqual(self.crawler.visited, {
+            "https://example.com/docs/",
+            "https://example.com/docs/intro",
+            "https://example.com/docs/faq",
+            "https://example.com/docs/login?next=https://example.com/docs/x",
+            "https://example.com/docs/b",
+        })
+
+    @patch('requests.Session.get')
+    def test_crawl_interns_urls(self, mock_get):
+        """Test crawled URLs are interned so index structures share one string"""
+        mock_get.return_value = mock_page('<html><body><a href="/about">About</a></body></html>')
+
+        self.crawler.crawl("https://example.com")
+
+        about = sys.intern("https://example.com/about")
+        self.assertIn(about, self.crawler.visited)
+        self.assertIs(next(u for u in self.crawler.index if u == about), about)
+        self.assertIs(next(u for u in self.crawler.visited if u == about), about)
+
+    @patch('requests.Session.get')
     def test_crawl_recursive(self, mock_get):
         """Test recursive crawling behavior with nested links"""
         # First level HTML
@@ -130,15 +385,14 @@ class WebCrawlerTests(unittest.TestCase):
         </body></html>
         """
         
-        def mock_get_response(url):
-            mock_resp = MagicMock()
+        def mock_get_response(url, **kwargs):
             if url == "https://example.com":
-                mock_resp.text = first_level_html
+                html = first_level_html
             elif url == "https://example.com/about":
-                mock_resp.text = second_level_html
+                html = second_level_html
             else:
-                mock_resp.text = "<html><body>Content</body></html>"
-            return mock_resp
+                html = "<html><body>Content</body></html>"
+            return mock_page(html)
             
         mock_get.side_effect = mock_get_response
         
@@ -149,7 +403,7 @@ class WebCrawlerTests(unittest.TestCase):
         self.assertIn("https://example.com/about", self.crawler.visited)
         self.assertIn("https://example.com/team", self.crawler.visited)
 
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_crawl_with_cycle(self, mock_get):
         """Test crawling with cyclic references to ensure no infinite loops"""
         cyclic_html = """
@@ -160,10 +414,8 @@ class WebCrawlerTests(unittest.TestCase):
         </body></html>
         """
         
-        def mock_get_response(url):
-            mock_resp = MagicMock()
-            mock_resp.text = cyclic_html
-            return mock_resp
+        def mock_get_response(url, **kwargs):
+            return mock_page(cyclic_html)
             
         mock_get.side_effect = mock_get_response
         
@@ -173,7 +425,88 @@ class WebCrawlerTests(unittest.TestCase):
         # We expect 3 calls: example.com, example.com/ (home), and example.com/about
         self.assertEqual(mock_get.call_count, 3)
 
-    @patch('requests.get')
+    @patch('requests.Session.get')
+    def test_crawl_depth_first_order(self, mock_get):
+        """Test pages are fetched depth-first in document order"""
+        pages = {
+            "https://example.com": '<a href="/a">A</a><a href="/b">B</a>',
+            "https://example.com/a": '<a href="/a/1">A1</a>',
+        }
+
+        def mock_get_response(url, **kwargs):
+            return mock_page(f"<html><body>{pages.get(url, 'Content')}</body></html>")
+
+        mock_get.side_effect = mock_get_response
+        crawler = WebCrawler(max_workers=1)
+
+        crawler.crawl("https://example.com")
+
+        fetched = [args[0] for args, kwargs in mock_get.call_args_list]
+        self.assertEqual(fetched, [
+            "https://example.com",
+            "https://example.com/a",
+            "https://example.com/a/1",
+            "https://example.com/b",
+        ])
+
+    @patch('requests.Session.get')
+    def test_crawl_deep_chain(self, mock_get):
+        """Test crawling a link chain deeper than the recursion limit"""
+        depth = sys.getrecursionlimit() + 100
+
+        def mock_get_response(url, **kwargs):
+            page = int(url.rsplit("/", 1)[-1]) if url.count("/") > 2 else 0
+            html = f'<html><body><a href="/{page + 1}">Next</a></body></html>'
+            if page >= depth:
+                html = "<html><body>End</body></html>"
+            return mock_page(html)
+
+        mock_get.side_effect = mock_get_response
+
+        self.crawler.crawl("https://example.com")
+
+        self.assertIn(f"https://example.com/{depth}", self.crawler.visited)
+        self.assertEqual(mock_get.call_count, depth + 1)
+
+    @patch('requests.Session.get')
+    def test_crawl_parses_chunked_stream(self, mock_get):
+        """Test pages are parsed across chunk boundaries and connections released"""
+        response = MagicMock()
+        response.encoding = "utf-8"
+        response.iter_content.return_value = [
+            b'<html><body><p>Caf\xc3', b'\xa9 menu</p><a hr', b'ef="/about">About</a>',
+            b'</body></html>',
+        ]
+        mock_get.return_value = response
+
+        self.crawler.crawl("https://example.com")
+
+        self.assertIn("caf\u00e9 menu", self.crawler.index["https://example.com"])
+        self.assertIn("https://example.com/about", self.crawler.visited)
+        self.assertEqual(response.close.call_count, 2)
+
+    @patch('requests.Session.get')
+    def test_crawl_decodes_declared_charsets(self, mock_get):
+        """Test charset labels lxml does not know are still decoded and crawled"""
+        def mock_get_response(url, **kwargs):
+            response = MagicMock()
+            if url == "https://example.com":
+                response.encoding = "latin-1"
+                response.iter_content.return_value = [b'<p>Caf\xe9</p><a href="/about">About</a>']
+            else:
+                response.encoding = "x-bogus-charset"
+                response.iter_content.return_value = [b'<p>About us</p><a href="/team">Team</a>']
+            return response
+
+        mock_get.side_effect = mock_get_response
+
+        self.crawler.crawl("https://example.com")
+
+        self.assertEqual(self.crawler.index["https://example.com"], "caf\u00e9about")
+        self.assertEqual(self.crawler.index["https://example.com/about"], "about usteam")
+        self.assertIn("https://example.com/team", self.crawler.visited)
+
+    @patch('requests.Session.get')
     def test_crawl_error_handling(self, mock_get):
         """Test error handling during crawling"""
         # First URL raises an exception
@@ -195,7 +528,7 @@ class WebCrawlerTests(unittest.TestCase):
         finally:
             sys.stdout = sys.__stdout__  # Restore stdout
 
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_crawl_connection_timeout(self, mock_get):
         """Test handling of connection timeout errors"""
         mock_get.side_effect = requests.exceptions.Timeout("Connection timed out")
@@ -210,34 +543,73 @@ class WebCrawlerTests(unittest.TestCase):
         finally:
             sys.stdout = sys.__stdout__
 
+    @patch('requests.Session.get')
+    def test_crawl_indexes_lowercase_text(self, mock_get):
+        """Test crawled text is stored lowercased for case-insensitive search"""
+        mock_get.return_value = mock_page("<html><body><p>This has the KEYWORD</p></body></html>")
+
+        self.crawler.crawl("https://example.com")
+
+        self.assertIn("this has the keyword", self.crawler.index["https://example.com"])
+        self.assertEqual(self.crawler.search("Keyword"), ["https://example.com"])
+
     def test_search_match(self):
         """Test search functionality with matching keyword"""
-        self.crawler.index["page1"] = "This has the keyword in content"
-        self.crawler.index["page2"] = "No matching text here"
+        self.crawler.index_page("page1", "This has the keyword in content")
+        self.crawler.index_page("page2", "No matching text here")
         
         results = self.crawler.search("keyword")
         self.assertEqual(results, ["page1"])
 
     def test_search_case_insensitive(self):
         """Test case-insensitive search"""
-        self.crawler.index["page1"] = "This has the KEYWORD in content"
-        self.crawler.index["page2"] = "Another KeyWord is here"
-        self.crawler.index["page3"] = "No matching text"
+        self.crawler.index_page("page1", "This has the KEYWORD in content")
+        self.crawler.index_page("page2", "Another KeyWord is here")
+        self.crawler.index_page("page3", "No matching text")
         
         results = self.crawler.search("keyword")
         self.assertIn("page1", results)
         self.assertIn("page2", results)
         self.assertEqual(len(results), 2)
 
+    def test_search_substring(self):
+        """Test search matches keywords inside longer words"""
+        self.crawler.index_page("page1", "Keywords are indexed")
+        self.crawler.index_page("page2", "The key is here")
+        self.crawler.index_page("page3", "No matching text")
+
+        self.assertEqual(self.crawler.search("keyword"), ["page1"])
+        self.assertEqual(self.crawler.search("KEY"), ["page1", "page2"])
+        self.assertEqual(self.crawler.search("ex"), ["page1", "page3"])
+
+    def test_search_ngram_false_positive(self):
+        """Test pages sharing every n-gram but not the keyword are excluded"""
+        self.crawler.index_page("page1", "abcd bcde")
+        self.crawler.index_page("page2", "abcde")
+
+        self.assertEqual(self.crawler.search("abcde"), ["page2"])
+
+    def test_search_short_keyword(self):
+        """Test short keywords are matched once per page and not across pages"""
+        self.crawler.index_page("page1", "Go go go, then stop")
+        self.crawler.index_page("page2", "Café ends with a")
+        self.crawler.index_page("page3", "b starts this one")
+
+        self.assertEqual(self.crawler.search("GO"), ["page1"])
+        self.assertEqual(self.crawler.search("é"), ["page2"])
+        self.assertEqual(self.crawler.search("ab"), [])
+        self.assertEqual(self.crawler.search("s"), ["page1", "page2", "page3"])
+
     def test_search_empty_index(self):
         """Test search on empty index"""
         results = self.crawler.search("keyword")
         self.assertEqual(results, [])
+        self.assertEqual(self.crawler.search(""), [])
 
     def test_search_no_match(self):
         """Test search with no matching results"""
-        self.crawler.index["page1"] = "Content without match"
-        self.crawler.index["page2"] = "More unrelated content"
+        self.crawler.index_page("page1", "Content without match")
+        self.crawler.index_page("page2", "More unrelated content")
         
         results = self.crawler.search("keyword")
         self.assertEqual(results, [])